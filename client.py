@@ -1,76 +1,151 @@
-"""
-client.py
-=========
-
-A simple echo client that sends messages to the server
-for the purpose of sending commands to the RPi to control the stepper motor.
-"""
-import os
-import sys
-import socket
-
-
-
-
-class Client:
-    def __init__(self,serverIP,serverPort):
-        self.serverIP = serverIP
-        self.serverPort = serverPort
-        self.socket = socket.socket(socket.AF_INET,socket.SOCK_STREAM)
-    
-    def connect_to_server(self) -> None:
-        self.socket.connect((self.serverIP,self.serverPort))
-        print(f"\n\n>> Connected to {self.serverIP}:{self.serverPort}.\n\n")
-    
-    def send(self,message) -> None:
-        self.socket.send(str.encode(message))
-        print(f"\n      >>     Sent: \"{message}\"")
-    
-    def receive(self,bufferSize) -> None:
-        message = self.socket.recv(bufferSize)
-        if message:
-            print(f"      >> Received: \"{message.decode('utf-8')}\"\n\n")
-
-    def close_connection(self) -> None:
-        self.socket.close()
-        print(">> Connection closed.\n\n\n")
-
-
-
-
-
-
-
-if __name__ == "__main__":
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print("\n\nValid commands:")
-    print(    "---------------\n")
-    print(    "   >  \"q\":  quit the program")
-    print(    "   -  \"c\":  close the connection")
-    print(    "   -  \"h\":  return the stepper motor to home position")
-    print(    "   -  \"sh\": set current position to new home position")
-    print(    "   -  \"rh\": reset the home position to the default home position")
-    print(    "   -  \"direction, angle, speed\":  move the stepper motor as specified\n\n")
-    
-    TCP_PORT = 5005
-    BUFFER_SIZE = 1024
-    TCP_IP = '192.168.1.13'
-    
-    client = Client(TCP_IP,TCP_PORT)
-    client.connect_to_server()
-    
-    while True:
-        userInput = input("   >> Input command:  ")
-        
-        if userInput == "q":
-            break
-        elif userInput == "c":
-            client.send(userInput)
-            client.receive(BUFFER_SIZE)
-            client.close_connection()
-            break
-        else:
-            client.send(userInput)
-            client.receive(BUFFER_SIZE)
-    
-    sys.exit()
\ No newline at end of file
+"""
+client.py
+=========
+
+A simple echo client that sends messages to the server
+for the purpose of sending commands to the RPi to control the stepper motor.
+Built on asyncio streams, so sends and receives can overlap
+and blocking input() runs in an executor instead of stalling the event loop.
+"""
+import os
+import sys
+import socket
+import asyncio
+
+
+
+
+class Client:
+    def __init__(self,serverIP,serverPort,socketOptions=None):
+        self.serverIP = serverIP
+        self.serverPort = serverPort
+        self.reader = None
+        self.writer = None
+        # TCP_NODELAY by default: commands are tiny and awaited immediately,
+        # so letting Nagle coalesce them only adds latency.
+        # Callers can pass their own (level,option,value) list to extend/override.
+        if socketOptions is None:
+            socketOptions = [(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)]
+        self.socketOptions = socketOptions
+        self.timeout = 5.0      # bound on how long receive() waits for a response
+        self._encCache = {}     # encoded bytes of the short fixed commands ("h", "sh", ...)
+        self._readerTask = None
+
+    async def connect_to_server(self) -> None:
+        # build the socket ourselves so options are set before connecting;
+        # the reuse options let a quick reconnect rebind without EADDRINUSE
+        # (SO_REUSEPORT doesn't exist on Windows, where this client usually runs)
+        sock = socket.socket(socket.AF_INET,socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET,socket.SO_REUSEADDR,1)
+        if hasattr(socket,'SO_REUSEPORT'):
+            sock.setsockopt(socket.SOL_SOCKET,socket.SO_REUSEPORT,1)
+        for level,option,value in self.socketOptions:
+            sock.setsockopt(level,option,value)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock,(self.serverIP,self.serverPort))
+        self.reader,self.writer = await asyncio.open_connection(sock=sock)
+        print(f"\n\n>> Connected to {self.serverIP}:{self.serverPort}.\n\n")
+
+    async def send(self,message) -> None:
+        # most sends are one of a handful of fixed commands, so cache their
+        # encoded bytes; only short strings are kept so ad-hoc
+        # "direction,angle,speed" variants don't grow the cache forever
+        data = self._encCache.get(message)
+        if data is None:
+            data = str.encode(message)
+            if len(message) < 8:
+                self._encCache[message] = data
+        self.writer.write(data)
+        await self.writer.drain()
+        print(f"\n      >>     Sent: \"{message}\"")
+
+    async def send_batch(self,commands) -> None:
+        """
+        Sends several commands in a single newline-delimited write,
+        so a multi-command sequence pays one syscall and one round trip
+        instead of one per command. The server executes the commands in
+        order and replies with a single consolidated ack.
+        """
+        self.writer.write(str.encode("\n".join(commands)))
+        await self.writer.drain()
+        print(f"\n      >>     Sent: {commands}")
+
+    async def receive(self,bufferSize) -> None:
+        try:
+            message = await asyncio.wait_for(self.reader.read(bufferSize),self.timeout)
+        except asyncio.TimeoutError:
+            print(f"      >> No response after {self.timeout}s; the command can be retried.\n\n")
+            return
+        if message:
+            print(f"      >> Received: \"{message.decode('utf-8')}\"\n\n")
+
+    def start_reader(self) -> None:
+        """
+        Starts a background task that prints everything the server sends,
+        so responses (and any pushed status updates) appear as they arrive
+        instead of queueing in the kernel while input() blocks.
+        Don't mix with explicit receive() calls - the task owns the stream.
+        """
+        self._readerTask = asyncio.create_task(self._reader_loop())
+
+    async def _reader_loop(self) -> None:
+        while True:
+            message = await self.reader.read(4096)
+            if not message: return      # server closed the connection
+            print(f"      >> Received: \"{message.decode('utf-8')}\"\n\n")
+
+    async def close_connection(self) -> None:
+        if self._readerTask and not self._readerTask.done():
+            self._readerTask.cancel()
+        self.writer.close()
+        await self.writer.wait_closed()
+        print(">> Connection closed.\n\n\n")
+
+
+
+
+
+
+
+async def main():
+    os.system('cls' if os.name == 'nt' else 'clear')
+    print("\n\nValid commands:")
+    print(    "---------------\n")
+    print(    "   >  \"q\":  quit the program")
+    print(    "   -  \"c\":  close the connection")
+    print(    "   -  \"h\":  return the stepper motor to home position")
+    print(    "   -  \"sh\": set current position to new home position")
+    print(    "   -  \"rh\": reset the home position to the default home position")
+    print(    "   -  \"direction, angle, speed\":  move the stepper motor as specified")
+    print(    "   -  commands separated by \";\" are sent as one batch\n\n")
+
+    TCP_PORT = 5005
+    TCP_IP = '192.168.1.13'
+
+    client = Client(TCP_IP,TCP_PORT)
+    await client.connect_to_server()
+    client.start_reader()       # responses are printed by the background reader
+    loop = asyncio.get_running_loop()
+
+    while True:
+        # input() blocks, so run it in the default executor to keep the loop free
+        userInput = await loop.run_in_executor(None,input,"   >> Input command:  ")
+
+        if userInput == "q":
+            break
+        elif userInput == "c":
+            await client.send(userInput)
+            await client._readerTask    # reader exits once the server closes the connection
+            await client.close_connection()
+            break
+        elif ";" in userInput:
+            await client.send_batch([command.strip() for command in userInput.split(";")])
+        else:
+            await client.send(userInput)
+
+
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    sys.exit()
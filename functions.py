@@ -1,10 +1,16 @@
 """
 Various functions that didn't fit anywhere else.
 """
-from math import floor
-from time import perf_counter
+import re
+from functools import lru_cache
+from time import perf_counter, sleep as _sleep
 from socket import socket, AF_INET, SOCK_DGRAM
 
+# steps per degree of rotation (512 steps / 360 degrees), precomputed once
+# so the per-command conversions are a single multiply
+STEPS_PER_DEGREE = 1.42222
+_INV_SPD = 1.0/STEPS_PER_DEGREE
+
 
 
 
@@ -12,9 +18,14 @@ from socket import socket, AF_INET, SOCK_DGRAM
 def sleep(duration):
     """
     More accurate sleep function than time.sleep().
+    Hands the bulk of the duration to time.sleep() so the CPU stays idle,
+    then spins on perf_counter() for only the last ~300us to keep step-edge precision.
+    The 300us of slack covers the scheduler's wakeup jitter on the Pi.
     """
-    start = perf_counter()
-    while perf_counter()-start < duration: pass
+    end = perf_counter() + duration
+    slack = duration - 0.0003
+    if slack > 0: _sleep(slack)
+    while perf_counter() < end: pass
 
 
 
@@ -26,9 +37,16 @@ def normalize(value,rangeStart,rangeEnd):
     For example, if the stepper needs to move 380 degrees CW to return home,
     on the range [-180,180] degrees, this will return 20 degrees, meaning 20 degrees CW.
     """
-    shift = value - rangeStart
-    rangeWidth = rangeEnd - rangeStart
-    return ( shift - (floor(shift/rangeWidth)*rangeWidth) ) + rangeStart
+    return ((value - rangeStart) % (rangeEnd - rangeStart)) + rangeStart
+
+
+
+def _norm_256(value):
+    """
+    Fast path of normalize() for the fixed [-256,256] step range used when homing.
+    Since the range width (512) is a power of two, the modulo is a pure bit-mask.
+    """
+    return ((value + 256) & 511) - 256
 
 
 
@@ -44,21 +62,36 @@ def get_ip():
 
 
 
+# field patterns for the schema regexes built by _compile_schema()
+# (numeric fields tolerate surrounding whitespace, as float()/int() did)
+_TYPE_PATTERNS = {
+    int:   r'\s*(-?\d+)\s*',
+    float: r'\s*(-?\d+(?:\.\d+)?)\s*',
+}
+
+
+@lru_cache(maxsize=None)
+def _compile_schema(types,delimiter):
+    """
+    Builds (and caches) the validation regex for a (types,delimiter) schema,
+    so parse() can validate on the happy path without any exception handling.
+    """
+    fields = [_TYPE_PATTERNS.get(t, r'([^'+re.escape(delimiter)+r']+)') for t in types]
+    return re.compile('^' + re.escape(delimiter).join(fields) + '$')
+
+
+
 def parse(data, types=[str,float,float], delimiter=',') -> list:
     """
     Parses the given data into a list with the given types.
     Both `types` and `delimiter` have the default values needed for stepper commands.
 
-    `None` will be returned if there is an issue casting an element to a given type,
+    `None` will be returned if the data doesn't match the expected schema,
      which is used by the server to detect a problem without needing to halt the program.
     """
-    data = data.split(delimiter)
-    for i in range(len(data)):
-        try:
-            data[i] = types[i](data[i])
-        except:
-            return None
-    return data
+    match = _compile_schema(tuple(types),delimiter).match(data)
+    if not match: return None
+    return [t(value) for t,value in zip(types,match.groups())]
 
 
 
@@ -66,4 +99,4 @@ def to_angle(steps) -> float:
     """
     Converts the given number of steps to a positive angle.
     """
-    return round(abs(steps/1.42222),1)
\ No newline at end of file
+    return round(abs(steps)*_INV_SPD,1)
\ No newline at end of file
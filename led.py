@@ -15,25 +15,29 @@ class LED:
     def __init__(self, pin:int):
         self.pin = pin
         GPIO.setup(self.pin,GPIO.OUT)
-        self.off()
-        
+        GPIO.output(self.pin,GPIO.LOW)
+        self._state = False     # last value written; the class is the only writer,
+                                # so this avoids a GPIO.input() read on every on/off call
+
 
     @property
     def is_on(self):
-        return GPIO.input(self.pin)
-    
+        return self._state
+
 
     def on(self):
         """
         Turns the LED on if not already on.
         """
-        if not self.is_on:
+        if not self._state:
             GPIO.output(self.pin,GPIO.HIGH)
-    
-    
+            self._state = True
+
+
     def off(self):
         """
         Turns the LED off if not already off.
         """
-        if self.is_on:
-            GPIO.output(self.pin,GPIO.LOW)
\ No newline at end of file
+        if self._state:
+            GPIO.output(self.pin,GPIO.LOW)
+            self._state = False
\ No newline at end of file
@@ -8,6 +8,7 @@ for the purpose of interpreting commands and relaying them to the stepper motor.
 import os
 import sys
 import socket
+import logging
 from led import LED
 from stepper import Stepper
 from functions import get_ip, parse
@@ -31,6 +32,8 @@ class Server:
     
     def accept_connection(self) -> None:
         self.connection,clientAddress = self.socket.accept()
+        # acks are tiny, so send them immediately rather than letting Nagle coalesce
+        self.connection.setsockopt(socket.IPPROTO_TCP,socket.TCP_NODELAY,1)
         if self.clientAddress is None:
             print("connection with {}:{} opened.\n\n".format(*clientAddress))
         elif clientAddress[0] != self.clientAddress[0]:
@@ -58,12 +61,46 @@ class Server:
 
 
 
+def run_command(stepper,data,isHomeDefault):
+    """
+    Executes a single stepper command and returns a (response,isHomeDefault) pair,
+    where response is the ack text the server relays to the client.
+    The single dispatch point for both interactive and batched commands.
+    "c" (close connection) is handled by the server loop itself and is
+    interactive-only; inside a batch it is reported as an invalid command.
+    """
+    if ',' in data:
+        commands = parse(data)      # parse the message/data into a list of commands
+        if commands:
+            direction,angle,speed = commands
+            stepper.set_speed_pct(speed)
+            stepper.rotate(direction,angle)
+            return "Sending command to stepper.",isHomeDefault
+        return "TypeError in command.",isHomeDefault
+    if data.lower() == "h":
+        stepper.go_home(isHomeDefault)      # go to home position, either default or user-defined based on flag
+        return "Sending stepper to home position.",isHomeDefault
+    if data.lower() == "sh":
+        stepper.set_home()
+        return "Setting current position to new home.",False    # home position is now user-defined
+    if data.lower() == "rh":
+        stepper.reset_home()
+        return "Resetting home position to default.",True       # home position is now default
+    return "Invalid command.",isHomeDefault
+
+
+
+
 
 
 
 if __name__ == "__main__":
     os.system('cls' if os.name == 'nt' else 'clear')
-    
+
+    # show stepper diagnostics on stdout (where print() used to send them,
+    # and where the server's own output goes); raise the level to silence them
+    logging.basicConfig(stream=sys.stdout, format="%(message)s", level=logging.INFO)
+
     # initialize LEDs and stepper motor
     red = LED(22)
     blue = LED( 5)
@@ -91,30 +128,16 @@ if __name__ == "__main__":
             if data.lower() == "c":
                 server.close_connection()
                 sys.exit()
-            
-            if ',' in data:
-                commands = parse(data)      # parse the message/data into a list of commands
-                if commands:
-                    direction,angle,speed = commands
-                    server.send("Sending command to stepper.")
-                    stepper.set_speed_pct(speed)
-                    stepper.rotate(direction,angle)
-                else:
-                    server.send("TypeError in command.")
-                
-            elif data.lower() == "h":
-                server.send("Sending stepper to home position.")
-                stepper.go_home(isHomeDefault)      # go to home position, either default or user-defined based on flag
-            
-            elif data.lower() == "sh":
-                server.send("Setting current position to new home.")
-                stepper.set_home()
-                isHomeDefault = False               # set flag to indicate that home position is user-defined
-            
-            elif data.lower() == "rh":
-                server.send("Resetting home position to default.")
-                stepper.reset_home()
-                isHomeDefault = True                # set flag to indicate that home position is default
-            
+
+            if '\n' in data:
+                # batched commands: execute them in order, then ack once with every response
+                responses = []
+                for command in data.split('\n'):
+                    if not command: continue
+                    response,isHomeDefault = run_command(stepper,command,isHomeDefault)
+                    responses.append(response)
+                server.send("\n".join(responses))
+
             else:
-                server.send("Invalid command.")
\ No newline at end of file
+                response,isHomeDefault = run_command(stepper,data,isHomeDefault)
+                server.send(response)
\ No newline at end of file
@@ -5,18 +5,93 @@ stepper.py
 Defines the Stepper class,
 which exposes several methods for controlling the stepper motor.
 """
-from math import floor
+import mmap
+import logging
+from array import array
 import RPi.GPIO as GPIO
-from functions import sleep, normalize, to_angle
+from functions import sleep, to_angle, _norm_256, STEPS_PER_DEGREE
+
+# pigpio is optional: when its daemon is running, step pulses are clocked
+# out by DMA instead of a timed Python loop
+try:    import pigpio
+except ImportError: pigpio = None
+
+# numba (with numpy) is optional: when present, the register step loop
+# is JIT-compiled so no interpreter dispatch happens between steps
+try:
+    import numba
+    import numpy
+except ImportError:
+    numba = None
 
 GPIO.setmode(GPIO.BCM)
 GPIO.setwarnings(False)
 
+# diagnostics go through a logger with lazy %-formatting, so when the level
+# is raised (or no handler is configured) no format work or stdout flush
+# happens anywhere near the step loops
+log = logging.getLogger('stepper')
+
+# word offsets of the BCM set/clear registers within the GPIO register page
+GPSET0 = 0x1C//4
+GPCLR0 = 0x28//4
+
+
+
+
+class FastGPIO:
+    """
+    Writes the BCM GPSET0/GPCLR0 registers directly through an mmap of /dev/gpiomem,
+    bypassing RPi.GPIO's per-call argument checking and library dispatch.
+    One 32-bit store sets (or clears) any number of pins at once, atomically.
+    Raises OSError on construction if /dev/gpiomem isn't available.
+    """
+    def __init__(self):
+        self._file = open('/dev/gpiomem','r+b')
+        self._mem = mmap.mmap(self._file.fileno(),4096)
+        self.registers = memoryview(self._mem).cast('I')
+        # numpy view of the same register page, typed for the JIT'd step loop
+        self.view = numpy.frombuffer(self._mem,dtype=numpy.uint32) if numba is not None else None
+
+
+    def write(self,setMask,clearMask):
+        """
+        Raises the pins in setMask and lowers the pins in clearMask.
+        """
+        self.registers[GPSET0] = setMask
+        self.registers[GPCLR0] = clearMask
+
+
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _step_loop(registers,masks,numSteps,delay):
+        """
+        JIT-compiled register step loop: numSteps full step cycles over the
+        flat (set,clear) mask array, with no interpreter dispatch per step.
+        The inter-step delay drops to objmode for functions.sleep(), since
+        nopython mode has no monotonic timer to spin on.
+        """
+        for i in range(numSteps*4):
+            j = (i & 3) << 1
+            registers[GPSET0] = masks[j]
+            registers[GPCLR0] = masks[j+1]
+            with numba.objmode():
+                sleep(delay)
+
 
 
 
 
 class Stepper:
+    # coil patterns (A1,A2,B1,B2) making up one full step cycle in each direction;
+    # rotate()'s GPIO.output fallback loop iterates these directly, and
+    # _coil_masks() derives the per-direction register masks from them
+    _CW_SEQ  = ((1,0,0,1),(0,1,0,1),(0,1,1,0),(1,0,1,0))
+    _CCW_SEQ = ((1,0,1,0),(0,1,1,0),(0,1,0,1),(1,0,0,1))
+
+
     def __init__(self,enablePin,coilA1Pin,coilA2Pin,coilB1Pin,coilB2Pin):
         # set initial values
         self.delay = 0.00195            # delay between steps (this delay corresponds to maximum speed)
@@ -31,14 +106,47 @@ class Stepper:
         self.coilA2Pin = coilA2Pin
         self.coilB1Pin = coilB1Pin
         self.coilB2Pin = coilB2Pin
-        # set pin modes
-        GPIO.setup(self.enablePin, GPIO.OUT)
-        GPIO.setup(self.coilA1Pin, GPIO.OUT)
-        GPIO.setup(self.coilA2Pin, GPIO.OUT)
-        GPIO.setup(self.coilB1Pin, GPIO.OUT)
-        GPIO.setup(self.coilB2Pin, GPIO.OUT)
-        # set enable pin to high
-        GPIO.output(self.enablePin,1)
+        # coil pins as a list, so one GPIO.output(pins,pattern) call drives all four coils
+        self._pins = [coilA1Pin,coilA2Pin,coilB1Pin,coilB2Pin]
+        # set pin modes (list mode: one call for all four coils, with initial levels
+        # fused in; RPi.GPIO's `initial` is a single value, so enable gets its own call)
+        GPIO.setup(self._pins, GPIO.OUT, initial=GPIO.LOW)
+        GPIO.setup(self.enablePin, GPIO.OUT, initial=GPIO.HIGH)
+        # connect to the pigpio daemon if it's running (preferred: DMA-timed pulses)
+        self.pi = None
+        if pigpio is not None:
+            pi = pigpio.pi()
+            if pi.connected: self.pi = pi
+            else: pi.stop()
+        # map the GPIO registers directly; fall back to RPi.GPIO calls if unavailable
+        try:    self.fastGPIO = FastGPIO()
+        except OSError: self.fastGPIO = None
+        # precompute the register masks for each sub-step in both directions,
+        # as flat uint32 arrays of alternating set/clear words (8 per direction),
+        # so the step loop is just an index calculation and two stores
+        self._cwMasks  = self._coil_masks(self._CW_SEQ)
+        self._ccwMasks = self._coil_masks(self._CCW_SEQ)
+        if numba is not None:
+            # numpy views of the same mask buffers, typed for the JIT'd step loop
+            self._cwMasksNp  = numpy.frombuffer(self._cwMasks,dtype=numpy.uint32)
+            self._ccwMasksNp = numpy.frombuffer(self._ccwMasks,dtype=numpy.uint32)
+
+
+    def _coil_masks(self,seq):
+        """
+        Converts a step sequence into a flat array.array('I') of
+        (set,clear) register mask pairs, one pair per sub-step.
+        Each pair drives all four coil pins with two 32-bit stores.
+        """
+        masks = array('I')
+        for pattern in seq:
+            setMask,clearMask = 0,0
+            for pin,value in zip(self._pins,pattern):
+                if value: setMask   |= 1 << pin
+                else:     clearMask |= 1 << pin
+            masks.append(setMask)
+            masks.append(clearMask)
+        return masks
         
     
     
@@ -93,11 +201,9 @@ class Stepper:
         """
         Sets the stepper motor to the given step.
         Never used directly, but used by rotate() and deactivate().
+        All four coils are driven in a single GPIO.output() call (list mode).
         """
-        GPIO.output(self.coilA1Pin,A1)
-        GPIO.output(self.coilA2Pin,A2)
-        GPIO.output(self.coilB1Pin,B1)
-        GPIO.output(self.coilB2Pin,B2)
+        GPIO.output(self._pins,(A1,A2,B1,B2))
         
         
         
@@ -117,9 +223,12 @@ class Stepper:
     def num_steps_required(self,angle):
         """
         Returns the number of steps required
-        to rotate the stepper motor to the given angle (lowball).
+        to rotate the stepper motor to the given angle.
+        Rounds half-up with a branch on sign instead of round(),
+        avoiding the built-in's banker's rounding and its call overhead.
         """
-        return int(round(1.4222*angle,0))
+        steps = angle*STEPS_PER_DEGREE
+        return int(steps+0.5) if steps >= 0 else int(steps-0.5)
     
     
 
@@ -130,62 +239,94 @@ class Stepper:
         The angle or number of steps can be specified to dictate rotation,
         as homing requires a specific number of steps to return to home accurately.
         """
-        # ensure the specified direction is valid
-        if direction.lower() not in ['cw','ccw']:
-            print("   >>   [Stepper] Invalid direction: {}".format(direction))
+        # normalize the direction once and dispatch on a flag,
+        # instead of re-lowercasing the string at every branch
+        directionFlag = {'cw': 1, 'ccw': -1}.get(direction.lower())
+        if directionFlag is None:
+            log.info("   >>   [Stepper] Invalid direction: %s", direction)
             return
-        
+
         # set the number of steps to rotate, regardless of whether angle or steps was given
         numSteps = self.num_steps_required(angle) if angle else steps if steps else None
         
         if not numSteps:    # exit method if angle nor steps was given
-            print("   >>   [Stepper] No angle or steps specified.")
+            log.info("   >>   [Stepper] No angle or steps specified.")
             return
         if not angle:       # if steps was given, calculate the approximate angle
             angle = f"~{to_angle(numSteps)}"
 
 
         self.redLED.off()
-        if direction.lower() == 'cw':
+        if directionFlag == 1:
             self.blueLED.on()
             self.greenLED.on()
-            # update stepsFromHome
-            self.stepsFromHome -= numSteps
-            self.stepsFromDefaultHome -= numSteps
-            print("      [Stepper] Rotating {} degrees CW ({} steps).\n\n".format(angle,numSteps))
-            # rotate clockwise
-            for i in range(numSteps):
-                self.set_step(1,0,0,1)
-                sleep(self.delay)
-                self.set_step(0,1,0,1)
-                sleep(self.delay)
-                self.set_step(0,1,1,0)
-                sleep(self.delay)
-                self.set_step(1,0,1,0)
-                sleep(self.delay)
-        
-        elif direction.lower() == 'ccw':
+            log.info("      [Stepper] Rotating %s degrees CW (%d steps).\n", angle, numSteps)
+            seq,masks = self._CW_SEQ,self._cwMasks
+        else:
             self.greenLED.on()
             self.orangeLED.on()
-            # update stepsFromHome
-            self.stepsFromHome += numSteps
-            self.stepsFromDefaultHome += numSteps
-            print("      [Stepper] Rotating {} degrees CCW ({} steps).\n\n".format(angle,numSteps))
-            # rotate counter-clockwise
+            log.info("      [Stepper] Rotating %s degrees CCW (%d steps).\n", angle, numSteps)
+            seq,masks = self._CCW_SEQ,self._ccwMasks
+
+        # update stepsFromHome (+ccw, -cw)
+        self.stepsFromHome -= directionFlag*numSteps
+        self.stepsFromDefaultHome -= directionFlag*numSteps
+
+        # bind the hot-path names to locals once, so the step loop
+        # does LOAD_FAST instead of repeated attribute lookups
+        delay = self.delay
+        if self.pi:
+            # timing is handled entirely by the DMA engine; Python just waits
+            self._rotate_wave(masks,numSteps)
+        elif self.fastGPIO and numba is not None:
+            # JIT-compiled loop over the register view and the typed masks
+            masksNp = self._cwMasksNp if directionFlag == 1 else self._ccwMasksNp
+            _step_loop(self.fastGPIO.view,masksNp,numSteps,delay)
+        elif self.fastGPIO:
+            # each sub-step is an index calculation and two direct register stores
+            registers = self.fastGPIO.registers
+            for i in range(numSteps*4):
+                j = (i & 3) << 1
+                registers[GPSET0] = masks[j]
+                registers[GPCLR0] = masks[j+1]
+                sleep(delay)
+        else:
+            # each sub-step drives all four coils in one GPIO.output() call
+            out = GPIO.output
+            pins = self._pins
             for i in range(numSteps):
-                self.set_step(1,0,1,0)
-                sleep(self.delay)
-                self.set_step(0,1,1,0)
-                sleep(self.delay)
-                self.set_step(0,1,0,1)
-                sleep(self.delay)
-                self.set_step(1,0,0,1)
-                sleep(self.delay)
-        
+                for pattern in seq:
+                    out(pins,pattern)
+                    sleep(delay)
+
         self.deactivate()   # deactivate the stepper motor when done rotating
 
-    
-    
+
+
+    def _rotate_wave(self,masks,numSteps):
+        """
+        Clocks out numSteps step cycles as a pigpio DMA wave.
+        The four sub-step transitions are compiled into one wave, which the
+        wave_chain loop counter repeats in hardware at microsecond precision,
+        so Python does no per-step work (and no per-step timing) at all.
+        Never used directly, but used by rotate() when the pigpio daemon is running.
+        """
+        pi = self.pi
+        delayMicros = int(self.delay*1e6)
+        pi.wave_add_generic([pigpio.pulse(setMask,clearMask,delayMicros)
+                             for setMask,clearMask in zip(masks[0::2],masks[1::2])])
+        waveID = pi.wave_create()
+        remaining = numSteps
+        while remaining > 0:
+            count = min(remaining,65535)    # wave_chain loop counters are 16-bit
+            pi.wave_chain([255,0, waveID, 255,1, count & 255, count >> 8])
+            while pi.wave_tx_busy():
+                sleep(0.001)
+            remaining -= count
+        pi.wave_delete(waveID)
+
+
+
     def go_home(self,default=True):
         """
         Rotates the stepper motor to the home position.
@@ -197,29 +338,28 @@ class Stepper:
         
         # print the steps required to go home, and in what direction
         if stepsFromHome > 0:
-            print("      [Stepper] Going Home: {} steps CW from here (~{} degrees).".format(stepsFromHome, to_angle(stepsFromHome)))
+            log.info("      [Stepper] Going Home: %d steps CW from here (~%s degrees).", stepsFromHome, to_angle(stepsFromHome))
         else:
-            print("      [Stepper] Going Home: {} steps CCW from here (~{} degrees).".format(abs(stepsFromHome), to_angle(stepsFromHome)))
+            log.info("      [Stepper] Going Home: %d steps CCW from here (~%s degrees).", abs(stepsFromHome), to_angle(stepsFromHome))
         
         # normalize the steps required to go home
-        steps = normalize(stepsFromHome,-256,256)
+        steps = _norm_256(stepsFromHome)
         
         # if already at home, exit method
         if steps == 0:
-            print("      [Stepper] Already home.")
+            log.info("      [Stepper] Already home.")
             return
         
         if steps < 0:
               self.rotate('ccw',steps=abs(steps))   # rotate CCW if stepsFromHome is negative
         else: self.rotate('cw',steps=steps)         # rotate CW if stepsFromHome is positive
         
-        # display the new stepsFromHome and reset it
-        # print("      [Stepper] Steps from home: {} (~{} degrees)\n\n".format(
-        #     normalize(stepsFromHome,-256,256),normalize(to_angle(stepsFromHome),-180,180)
-        # ))
+        # snap the counter for the home we just reached to exactly 0
+        # (rotate() already updated both counters by the steps moved;
+        # this only strips the full revolutions dropped by normalizing,
+        # and must not touch the other counter)
         if default: self.stepsFromDefaultHome = 0
         else:       self.stepsFromHome = 0
-        self.stepsFromHome = 0
     
 
 
@@ -228,7 +368,7 @@ class Stepper:
         Sets the current position as the home position.
         """
         self.stepsFromHome = 0
-        print("      [Stepper] New home set.\n\n")
+        log.info("      [Stepper] New home set.\n")
     
 
 
@@ -237,4 +377,4 @@ class Stepper:
         Resets the home position to the default home position.
         """
         self.stepsFromHome = self.stepsFromDefaultHome
-        print("      [Stepper] Home reset.\n\n")
\ No newline at end of file
+        log.info("      [Stepper] Home reset.\n")
\ No newline at end of file